@@ -4,15 +4,300 @@ Docker Compose Generator for Klever Services
 Generates dynamic docker-compose.yml files for Docker Swarm deployments
 """
 
+import copy
 import json
-import yaml
+import re
 import sys
 import argparse
 from typing import Dict, List, Any, Optional
 
+try:
+    # Optional accelerator for parsing the JSON-valued CLI arguments;
+    # everything works on the stdlib json module without it
+    import orjson
+except ImportError:
+    orjson = None
+
+# Write buffer for the output file, sized to comfortably hold a full
+# compose document so the emitter's many small writes coalesce into a
+# single syscall per file
+_OUTPUT_BUFFER_SIZE = 1 << 20
+
+# --- Specialized compose-YAML writer -----------------------------------
+#
+# The generated tree only ever contains dicts, lists and builtin scalars
+# in block style, which is a small fraction of what a general-purpose
+# YAML emitter has to support. dump_compose_yaml() below serializes that
+# subset directly, quoting exactly the strings a YAML 1.1 loader would
+# otherwise resolve to another type or misparse.
+
+# Strings a YAML 1.1 resolver would implicitly type as bool/int/float/
+# null/timestamp (or treat as the '=' value key); these must be quoted
+# to stay strings. Over-matching is safe - it only costs quotes.
+_IMPLICIT_NON_STR_RE = re.compile(r'''^(?:
+    yes|Yes|YES|no|No|NO|true|True|TRUE|false|False|FALSE|on|On|ON|off|Off|OFF
+    |null|Null|NULL|~
+    |[-+]?0b[0-1_]+|[-+]?0[0-7_]+|[-+]?(?:0|[1-9][0-9_]*)|[-+]?0x[0-9a-fA-F_]+
+    |[-+]?[1-9][0-9_]*(?::[0-5]?[0-9])+
+    |[-+]?(?:[0-9][0-9_]*)\.[0-9_]*(?:[eE][-+][0-9]+)?
+    |[-+]?\.[0-9_]+(?:[eE][-+][0-9]+)?
+    |[-+]?[0-9][0-9_]*(?::[0-5]?[0-9])+\.[0-9_]*
+    |[-+]?\.(?:inf|Inf|INF)|\.(?:nan|NaN|NAN)
+    |[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9].*
+    |=
+)$''', re.X)
+
+# Characters that start another YAML construct when they lead a plain
+# scalar; '-', '?' and ':' are only indicators when followed by a space
+# (or standing alone) and are checked separately.
+_PLAIN_UNSAFE_LEAD = set(",[]{}#&*!|>'\"%@` \t")
+
+# Named escapes for double-quoted style; anything else non-printable is
+# spelled as \xXX / \uXXXX / \UXXXXXXXX
+_DQ_ESCAPES = {
+    '\\': '\\\\', '"': '\\"', '\0': '\\0', '\a': '\\a', '\b': '\\b',
+    '\t': '\\t', '\n': '\\n', '\v': '\\v', '\f': '\\f', '\r': '\\r',
+    '\x1b': '\\e',
+}
+
+
+def _double_quoted(text: str) -> str:
+    """Render a string in double-quoted style with escaped specials.
+
+    This is the only YAML style that can represent newlines and control
+    characters verbatim - single-quoted scalars would fold them away.
+    """
+    chunks = ['"']
+    for char in text:
+        escape = _DQ_ESCAPES.get(char)
+        if escape is not None:
+            chunks.append(escape)
+        elif char.isprintable():
+            chunks.append(char)
+        else:
+            code = ord(char)
+            if code <= 0xFF:
+                chunks.append('\\x%02X' % code)
+            elif code <= 0xFFFF:
+                chunks.append('\\u%04X' % code)
+            else:
+                chunks.append('\\U%08X' % code)
+    chunks.append('"')
+    return ''.join(chunks)
+
+
+def _plain_scalar_safe(text: str) -> bool:
+    """Check whether a string can be emitted as an unquoted plain scalar"""
+    if not text or text != text.strip():
+        return False
+    if text[0] in _PLAIN_UNSAFE_LEAD:
+        return False
+    if text[0] in '-?:' and (len(text) == 1 or text[1] in ' \t'):
+        return False
+    if ': ' in text or text.endswith(':') or ' #' in text:
+        return False
+    if not text.isprintable():
+        return False
+    return not _IMPLICIT_NON_STR_RE.match(text)
+
+
+def _scalar_text(value: Any) -> str:
+    """Render a scalar the way a YAML loader will read it back unchanged"""
+    if value is True:
+        return 'true'
+    if value is False:
+        return 'false'
+    if value is None:
+        return 'null'
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        if value != value:
+            return '.nan'
+        if value == float('inf'):
+            return '.inf'
+        if value == float('-inf'):
+            return '-.inf'
+        text = repr(value)
+        if '.' not in text and 'e' in text:
+            # YAML 1.1 floats require a dot: 1e-09 must read 1.0e-09
+            text = text.replace('e', '.0e')
+        return text
+    text = str(value)
+    if _plain_scalar_safe(text):
+        return text
+    if text.isprintable() or not text:
+        return "'" + text.replace("'", "''") + "'"
+    return _double_quoted(text)
+
+
+def _write_mapping(mapping: Dict, stream, indent: int) -> None:
+    pad = '  ' * indent
+    for key, value in mapping.items():
+        kstr = _scalar_text(key)
+        if isinstance(value, dict):
+            if value:
+                stream.write(f'{pad}{kstr}:\n')
+                _write_mapping(value, stream, indent + 1)
+            else:
+                stream.write(f'{pad}{kstr}: {{}}\n')
+        elif isinstance(value, (list, tuple)):
+            if value:
+                stream.write(f'{pad}{kstr}:\n')
+                # Block sequence dashes sit at the key's own indent,
+                # matching the emitter output this writer replaced
+                _write_sequence(value, stream, indent)
+            else:
+                stream.write(f'{pad}{kstr}: []\n')
+        else:
+            stream.write(f'{pad}{kstr}: {_scalar_text(value)}\n')
+
+
+def _write_sequence(seq, stream, indent: int) -> None:
+    pad = '  ' * indent
+    for item in seq:
+        if isinstance(item, dict):
+            if not item:
+                stream.write(f'{pad}- {{}}\n')
+                continue
+            # First key rides on the dash line, the rest align under it
+            lead = f'{pad}- '
+            for key, value in item.items():
+                kstr = _scalar_text(key)
+                if isinstance(value, dict):
+                    if value:
+                        stream.write(f'{lead}{kstr}:\n')
+                        _write_mapping(value, stream, indent + 2)
+                    else:
+                        stream.write(f'{lead}{kstr}: {{}}\n')
+                elif isinstance(value, (list, tuple)):
+                    if value:
+                        stream.write(f'{lead}{kstr}:\n')
+                        _write_sequence(value, stream, indent + 1)
+                    else:
+                        stream.write(f'{lead}{kstr}: []\n')
+                else:
+                    stream.write(f'{lead}{kstr}: {_scalar_text(value)}\n')
+                lead = f'{pad}  '
+        elif isinstance(item, (list, tuple)):
+            # Nested bare sequences never occur in compose documents, but
+            # stay correct if one ever shows up
+            if not item:
+                stream.write(f'{pad}- []\n')
+            else:
+                stream.write(f'{pad}-\n')
+                _write_sequence(item, stream, indent + 1)
+        else:
+            stream.write(f'{pad}- {_scalar_text(item)}\n')
+
+
+def dump_compose_yaml(compose: Dict[str, Any], stream) -> None:
+    """Serialize a compose tree of builtin primitives as block-style YAML"""
+    _write_mapping(compose, stream, 0)
+
+# End-of-run status lines, assembled and written to stdout in one pass
+_MSG_GENERATED = '✅ Generated {output}'
+_WARN_SECRETS = '⚠️  Remember to create the external secrets before deploying'
+_WARN_CONSTRAINTS = '⚠️  Ensure nodes have the required labels for placement constraints'
+_INFO_NETWORK_SEPARATION = 'ℹ️  Network separation enabled - ensure services can communicate as needed'
+
+# Docker log tag template - a literal passed through to the log driver,
+# not an interpolation done by this script
+_LOG_TAG = '{.Name}/{.ID}'
+
+# Prometheus scraping labels: the constant label is reused as-is and the
+# varying ones are precompiled templates filled per service via format_map
+_MONITORING_SCRAPE_LABEL = 'prometheus.io/scrape=true'
+_MONITORING_LABEL_TEMPLATES = (
+    'prometheus.io/port={port}',
+    'prometheus.io/path={path}',
+    'prometheus.io/job={svc}',
+    'service.name={svc}'
+)
+
+
+# Hostnames and Traefik label prefixes are stable for a given service /
+# env / fqdn, so they are cached across repeat in-process runs the same
+# way parsed configs are (see _parse_cache below)
+_hostname_cache: Dict[tuple, str] = {}
+_label_prefix_cache: Dict[str, tuple] = {}
+
+
+def build_service_hostname(domain: str, env: str, fqdn: str) -> str:
+    """Build the external hostname for an exposed service"""
+    key = (domain, env, fqdn)
+    hostname = _hostname_cache.get(key)
+    if hostname is None:
+        hostname = f'{domain}.{fqdn}' if env == 'prod' else f'{domain}-{env}.{fqdn}'
+        _hostname_cache[key] = hostname
+    return hostname
+
+
+def service_label_prefixes(service_name: str) -> tuple:
+    """Return the (router, middleware) Traefik label prefixes for a service"""
+    prefixes = _label_prefix_cache.get(service_name)
+    if prefixes is None:
+        prefixes = (
+            f'traefik.http.routers.{service_name}',
+            f'traefik.http.middlewares.{service_name}'
+        )
+        _label_prefix_cache[service_name] = prefixes
+    return prefixes
+
+
+# Shared immutable default for per-service .get() lookups in the hot
+# loops; saves allocating a fresh empty dict on every miss. Read-only.
+_EMPTY: Dict[str, Any] = {}
+
+
+def is_background_service(name: str) -> bool:
+    """Check if a service is a background worker/job (never exposed by default)"""
+    lname = name.lower()
+    return 'worker' in lname or 'job' in lname
+
+
+def is_exposed_service(name: str, expose_override: Optional[bool] = None) -> bool:
+    """Decide whether a service is exposed through Traefik.
+
+    expose flag | worker/job name | exposed
+    ------------+-----------------+--------
+    True        | either          | True
+    False       | either          | False
+    unset       | no              | True
+    unset       | yes             | False
+    """
+    if expose_override is not None:
+        return expose_override
+    return not is_background_service(name)
+
+
+def classify_exposure(services: List[str], service_configs: Optional[Dict[str, Dict]] = None) -> Dict[str, bool]:
+    """Classify the exposure of every service in one pass"""
+    configs = service_configs or {}
+    return {
+        svc: is_exposed_service(svc, configs.get(svc, _EMPTY).get('expose'))
+        for svc in services
+    }
+
+
+# Cache for parse_array_config keyed by the serialized config, so tooling
+# that imports this module and re-parses the same config (e.g. once per
+# environment) does not redo the work. A single CLI run never hits it.
+_parse_cache: Dict[str, Dict[str, Any]] = {}
+
 
 def parse_array_config(config_array):
-    """Parse array-based configuration format into traditional format"""
+    """Parse array-based configuration format into traditional format
+
+    Results are memoized on the JSON serialization of the input, so repeated
+    calls with an identical config skip the parse. Hits hand back a deep
+    copy - callers may mutate nested lists/dicts without poisoning the cache.
+    """
+    cache_key = json.dumps(config_array, sort_keys=True)
+    cached = _parse_cache.get(cache_key)
+    if cached is not None:
+        return copy.deepcopy(cached)
+
     services = []
     images = {}
     domains = []
@@ -62,7 +347,7 @@ def parse_array_config(config_array):
         images[name] = svc['image']
         
         # Extract domain and port for exposed services
-        if svc.get('expose', True) and not ('worker' in name.lower() or 'job' in name.lower()):
+        if is_exposed_service(name, svc.get('expose')):
             if 'domain' in svc:
                 domains.append(svc['domain'])
             elif 'port' in svc:
@@ -84,7 +369,7 @@ def parse_array_config(config_array):
             svc_config['networks'] = svc['networks']
             # Extract external networks (those starting with certain patterns or explicitly marked)
             for net in svc['networks']:
-                if any(prefix in net for prefix in ['shared-', 'external-']) or '-db' in net:
+                if net.startswith(('shared-', 'external-')) or '-db' in net:
                     external_networks.add(net)
         if 'internal_port' in svc:
             svc_config['internal_port'] = str(svc['internal_port'])
@@ -126,13 +411,9 @@ def parse_array_config(config_array):
         if 'secrets' in svc:
             service_secrets[name] = svc['secrets']
         
-        # Update global config from service if explicitly set
-        for key in ['replicas', 'env', 'fqdn', 'health_checks', 'resource_limits', 
-                   'volume_persistence', 'volume_dir', 'enable_retry', 'enable_rate_limit',
-                   'enable_monitoring', 'enable_network_separation', 'deployment_strategy',
-                   'use_secrets', 'enable_logging']:
-            if key in svc:
-                global_config[key] = svc[key]
+        # Update global config from service if explicitly set; the keys-view
+        # intersection only visits keys the service actually overrides
+        global_config.update((key, svc[key]) for key in global_config.keys() & svc.keys())
     
     # Remove default networks from external networks
     external_networks.discard('traefik-public')
@@ -140,12 +421,16 @@ def parse_array_config(config_array):
     external_networks.discard('database')
     
     # Ensure we have at least one domain/port for exposed services
-    if not domains and any(service_configs.get(s, {}).get('expose', True) for s in services):
+    has_exposed = any(
+        is_exposed_service(s, service_configs.get(s, _EMPTY).get('expose'))
+        for s in services
+    )
+    if not domains and has_exposed:
         domains = ['app']  # Default domain
-    if not ports and any(service_configs.get(s, {}).get('expose', True) for s in services):
+    if not ports and has_exposed:
         ports = ['8080']  # Default port
     
-    return {
+    parsed = {
         'services': services,
         'images': images,
         'domains': domains,
@@ -164,18 +449,36 @@ def parse_array_config(config_array):
         'advanced_health': advanced_health,
         **global_config
     }
+    # The cache keeps its own private copy; the freshly built tree goes to
+    # the caller, so first-call mutations can't leak into later hits either
+    _parse_cache[cache_key] = copy.deepcopy(parsed)
+    return parsed
 
 
-def generate_logging_config(service_name: str, env: str) -> Dict[str, Any]:
-    """Generate logging configuration for a service"""
+def generate_logging_config(
+    service_name: str,
+    env: str,
+    options_template: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """Generate logging configuration for a service
+
+    The env-dependent options can be precomputed once with
+    generate_logging_options() and passed in when generating many services.
+    """
+    options = dict(options_template) if options_template else generate_logging_options(env)
+    options['labels'] = f'service={service_name},environment={env}'
+    options['tag'] = _LOG_TAG
     return {
         'driver': 'json-file',
-        'options': {
-            'max-size': '10m' if env == 'prod' else '50m',
-            'max-file': '3' if env == 'prod' else '5',
-            'labels': f'service={service_name},environment={env}',
-            'tag': f'{{.Name}}/{{.ID}}'
-        }
+        'options': options
+    }
+
+
+def generate_logging_options(env: str) -> Dict[str, str]:
+    """Generate the env-dependent logging driver options"""
+    return {
+        'max-size': '10m' if env == 'prod' else '50m',
+        'max-file': '3' if env == 'prod' else '5'
     }
 
 
@@ -198,8 +501,17 @@ def generate_placement_constraints(
     return {'constraints': constraints} if constraints else None
 
 
-def generate_networks(services: List[str], enable_network_separation: bool = False, external_networks: List[str] = None) -> Dict[str, Any]:
-    """Generate network configuration"""
+def generate_networks(
+    services: List[str],
+    enable_network_separation: bool = False,
+    external_networks: List[str] = None,
+    service_set: Optional[frozenset] = None
+) -> Dict[str, Any]:
+    """Generate network configuration
+
+    Callers that already hold the services as a frozenset can pass it via
+    service_set to skip rebuilding it for the membership tests.
+    """
     networks = {
         'traefik-public': {
             'external': True
@@ -214,22 +526,27 @@ def generate_networks(services: List[str], enable_network_separation: bool = Fal
     if not enable_network_separation:
         return networks
     
+    # Classify services with one set build instead of rescanning the
+    # service list per network type
+    if service_set is None:
+        service_set = frozenset(services)
+
     # Add internal network for backend services
-    if any(svc in ['api', 'worker', 'backend'] for svc in services):
+    if service_set & {'api', 'worker', 'backend'}:
         networks['backend'] = {
             'driver': 'overlay',
             'internal': True,
             'encrypted': True
         }
-    
+
     # Add database network if needed
-    if any(svc in ['db', 'database', 'postgres', 'mysql'] for svc in services):
+    if service_set & {'db', 'database', 'postgres', 'mysql'}:
         networks['database'] = {
             'driver': 'overlay',
             'internal': True,
             'encrypted': True
         }
-    
+
     return networks
 
 
@@ -247,7 +564,7 @@ def generate_resource_limits(
     
     # Default resource limits based on service type - only limits, no reservations
     # This prevents breaking Docker scheduler on tight VPS environments
-    if 'worker' in service_name or 'job' in service_name:
+    if is_background_service(service_name):
         return {
             'limits': {'cpus': '1.0', 'memory': '1G'}
         }
@@ -261,7 +578,7 @@ def generate_resource_limits(
         }
 
 
-def generate_update_config(service_name: str, env: str, strategy: str = 'rolling') -> Dict[str, Any]:
+def generate_update_config(env: str, strategy: str = 'rolling') -> Dict[str, Any]:
     """Generate update configuration with monitoring"""
     if strategy == 'rolling':
         return {
@@ -350,28 +667,66 @@ def generate_compose(
     external_nets = []
     if external_networks:
         external_nets = external_networks if isinstance(external_networks, list) else [external_networks]
-    
+
+    # Strip service names once and materialize them as a frozenset for the
+    # membership tests done while generating networks
+    services = [svc.strip() for svc in services]
+    service_set = frozenset(services)
+
     compose = {
         'version': '3.8',
         'services': {},
-        'networks': generate_networks(services, enable_network_separation, external_nets),
+        'networks': generate_networks(services, enable_network_separation, external_nets, service_set),
         'volumes': {}
     }
     
-    # Add secrets section if enabled
+    # Add secrets section if enabled. All secret emission below funnels
+    # through this single alias; it is created on demand when explicit
+    # service secrets are mapped without --use-secrets
+    compose_secrets = None
     if use_secrets:
-        compose['secrets'] = {}
+        compose_secrets = compose['secrets'] = {}
+
+    # Health URLs are looked up by service index below; strip them once up
+    # front instead of once per service
+    health_urls = [url.strip() for url in health_urls] if health_urls else []
+
+    compose_volumes = compose['volumes']
+
+    # Classify exposure in one shared pass up front (main() runs the same
+    # classification for its input validation)
+    exposure = classify_exposure(services, service_configs)
+
+    # Deploy/logging sections that depend only on env and strategy are built
+    # once here and shared by reference across all service entries; the
+    # compose writer serializes each reference in place, so the output is
+    # identical to copies. Callers must treat these sections as read-only.
+    update_config_template = generate_update_config(env, deployment_strategy)
+    logging_options_template = generate_logging_options(env) if enable_logging else None
+    restart_policy_template = {
+        'condition': 'on-failure',
+        'delay': '5s',
+        'max_attempts': 5,
+        'window': '120s'
+    }
+    rollback_config_template = {
+        'parallelism': 1,
+        'delay': '10s',
+        'failure_action': 'continue',
+        'monitor': '5m',
+        'max_failure_ratio': 0.1
+    } if env == 'prod' else None
 
     for i, svc in enumerate(services):
-        svc = svc.strip()
-        
-        # Get service-specific configuration
-        svc_config = service_configs.get(svc, {}) if service_configs else {}
-        
-        # Check if service should be exposed (default: yes, unless it's a worker/job or explicitly set)
-        is_exposed = svc_config.get('expose', True)
-        if not is_exposed or 'worker' in svc.lower() or 'job' in svc.lower():
-            is_exposed = svc_config.get('expose', False)
+        # Get service-specific configuration and unpack the fields consulted
+        # below once, instead of repeating the .get() chains
+        svc_config = service_configs.get(svc, _EMPTY) if service_configs else _EMPTY
+        custom_networks = svc_config.get('networks')
+        internal_port = svc_config.get('internal_port', '8080')
+
+        # Exposure was classified in the shared pass above: an explicit
+        # expose flag wins, otherwise everything except workers/jobs
+        is_exposed = exposure[svc]
         
         # Get domain and port only if exposed
         domain = None
@@ -380,9 +735,7 @@ def generate_compose(
         if is_exposed and i < len(domains) and i < len(ports):
             domain = domains[i]
             port = ports[i]
-            fqdn_full = f"{domain}-{env}.{fqdn}"
-            if env == 'prod':
-                fqdn_full = f"{domain}.{fqdn}"
+            fqdn_full = build_service_hostname(domain, env, fqdn)
         
         image = images.get(svc, 'nginx:latest')
         
@@ -390,42 +743,46 @@ def generate_compose(
         service_networks = []
         
         # Add custom networks from service config
-        if 'networks' in svc_config:
-            service_networks.extend(svc_config['networks'])
+        if custom_networks is not None:
+            service_networks.extend(custom_networks)
         else:
             # Default network assignment
             if is_exposed:
                 service_networks.append('traefik-public')
             
             if enable_network_separation:
-                if svc in ['api', 'backend'] or 'api' in svc.lower():
+                # Both API-ish and worker-ish services land on the backend
+                # network; lowercase the name once for all the scans
+                svc_lower = svc.lower()
+                if (svc == 'backend' or 'api' in svc_lower
+                        or 'worker' in svc_lower or 'job' in svc_lower):
                     service_networks.append('backend')
-                elif svc in ['worker', 'job'] or 'worker' in svc.lower() or 'job' in svc.lower():
-                    service_networks.append('backend')
-                
+
         # Ensure we have at least one network
         if not service_networks:
             service_networks = ['traefik-public'] if is_exposed else ['backend' if enable_network_separation else 'traefik-public']
         
-        # Build labels
-        labels = []
-        
-        # Only add Traefik labels if service is exposed
+        # Build labels - Traefik labels only when the service is exposed.
+        # Lists cannot be pre-sized in Python, so seeding the list from one
+        # literal of known size is the closest thing to preallocation.
         if is_exposed and port and fqdn_full:
             # Build middleware list
             middlewares = ['secureHeaders@file']
-            
-            labels.extend([
+
+            # Shared label prefixes, cached per service across repeat runs
+            router, middleware = service_label_prefixes(svc)
+
+            labels = [
                 'traefik.enable=true',
                 'traefik.swarm.network=traefik-public',
-                f'traefik.http.routers.{svc}.rule=Host(`{fqdn_full}`)',
-                f'traefik.http.routers.{svc}.entrypoints=websecure',
-                f'traefik.http.routers.{svc}.tls=true',
-                f'traefik.http.routers.{svc}.tls.certresolver=cloudflare',
+                f'{router}.rule=Host(`{fqdn_full}`)',
+                f'{router}.entrypoints=websecure',
+                f'{router}.tls=true',
+                f'{router}.tls.certresolver=cloudflare',
                 f'traefik.http.services.{svc}.loadbalancer.server.port={port}',
-                f'traefik.http.routers.{svc}.service={svc}'
-            ])
-            
+                f'{router}.service={svc}'
+            ]
+
             # Add retry middleware if enabled
             if enable_retry:
                 middlewares.append(f'{svc}-retry')
@@ -435,10 +792,10 @@ def generate_compose(
                     retry_attempts = retry_config[svc].get('attempts', 3)
                     retry_interval = retry_config[svc].get('interval', '100ms')
                 labels.extend([
-                    f'traefik.http.middlewares.{svc}-retry.retry.attempts={retry_attempts}',
-                    f'traefik.http.middlewares.{svc}-retry.retry.initialinterval={retry_interval}'
+                    f'{middleware}-retry.retry.attempts={retry_attempts}',
+                    f'{middleware}-retry.retry.initialinterval={retry_interval}'
                 ])
-            
+
             # Add rate limit middleware if enabled
             if enable_rate_limit:
                 middlewares.append(f'{svc}-ratelimit')
@@ -448,13 +805,15 @@ def generate_compose(
                     rate_average = rate_limit_config[svc].get('average', 100)
                     rate_burst = rate_limit_config[svc].get('burst', 50)
                 labels.extend([
-                    f'traefik.http.middlewares.{svc}-ratelimit.ratelimit.average={rate_average}',
-                    f'traefik.http.middlewares.{svc}-ratelimit.ratelimit.burst={rate_burst}'
+                    f'{middleware}-ratelimit.ratelimit.average={rate_average}',
+                    f'{middleware}-ratelimit.ratelimit.burst={rate_burst}'
                 ])
-            
+
             # Set the middlewares
-            labels.append(f'traefik.http.routers.{svc}.middlewares={",".join(middlewares)}')
-        
+            labels.append(f'{router}.middlewares={",".join(middlewares)}')
+        else:
+            labels = []
+
         # Add monitoring labels if enabled (for local Prometheus instances)
         if enable_monitoring:
             metrics_path = '/metrics'
@@ -462,15 +821,11 @@ def generate_compose(
                 metrics_path = metrics_paths[svc]
             
             # Get monitoring port (use service port or from config)
-            monitoring_port = port if port else svc_config.get('internal_port', '8080')
+            monitoring_port = port if port else internal_port
             
-            labels.extend([
-                f'prometheus.io/scrape=true',
-                f'prometheus.io/port={monitoring_port}',
-                f'prometheus.io/path={metrics_path}',
-                f'prometheus.io/job={svc}',
-                f'service.name={svc}'
-            ])
+            fields = {'port': monitoring_port, 'path': metrics_path, 'svc': svc}
+            labels.append(_MONITORING_SCRAPE_LABEL)
+            labels.extend(template.format_map(fields) for template in _MONITORING_LABEL_TEMPLATES)
         
         config = {
             'image': image,
@@ -483,25 +838,14 @@ def generate_compose(
             'deploy': {
                 'replicas': replicas,
                 'labels': labels,
-                'update_config': generate_update_config(svc, env, deployment_strategy),
-                'restart_policy': {
-                    'condition': 'on-failure',
-                    'delay': '5s',
-                    'max_attempts': 5,
-                    'window': '120s'
-                }
+                'update_config': update_config_template,
+                'restart_policy': restart_policy_template
             }
         }
         
         # Add rollback configuration for production
-        if env == 'prod':
-            config['deploy']['rollback_config'] = {
-                'parallelism': 1,
-                'delay': '10s',
-                'failure_action': 'continue',
-                'monitor': '5m',
-                'max_failure_ratio': 0.1
-            }
+        if rollback_config_template:
+            config['deploy']['rollback_config'] = rollback_config_template
         
         # Add placement constraints
         placement = generate_placement_constraints(svc, env, node_constraints)
@@ -510,35 +854,41 @@ def generate_compose(
         
         # Add logging configuration
         if enable_logging:
-            config['logging'] = generate_logging_config(svc, env)
+            config['logging'] = generate_logging_config(svc, env, logging_options_template)
+
+        # Secret mounts for this service are collected here and attached in
+        # one assignment below instead of per-append setdefault chains
+        secret_mounts = []
 
         # Add custom environment variables
-        custom_env = service_envs.get(svc, {})
+        custom_env = service_envs.get(svc, _EMPTY)
         for key, value in custom_env.items():
             # Use secrets for sensitive data in production
             if use_secrets and env == 'prod' and any(
-                sensitive in key.lower() 
+                sensitive in key.lower()
                 for sensitive in ['password', 'secret', 'key', 'token']
             ):
                 secret_name = f'{svc}_{key.lower()}'
-                config.setdefault('secrets', []).append({
+                secret_mounts.append({
                     'source': secret_name,
                     'target': f'/run/secrets/{key.lower()}',
                     'mode': 0o400
                 })
-                compose['secrets'][secret_name] = {'external': True}
+                compose_secrets[secret_name] = {'external': True}
                 # Set env var to point to secret file
                 config['environment'].append(f'{key}_FILE=/run/secrets/{key.lower()}')
             else:
                 config['environment'].append(f'{key}={value}')
-        
+
         # Add explicitly mapped secrets from service_secrets
         if service_secrets and svc in service_secrets:
+            if compose_secrets is None:
+                compose_secrets = compose['secrets'] = {}
             for secret in service_secrets[svc]:
                 if isinstance(secret, str):
                     # Simple secret name
-                    config.setdefault('secrets', []).append(secret)
-                    compose['secrets'][secret] = {'external': True}
+                    secret_mounts.append(secret)
+                    compose_secrets[secret] = {'external': True}
                 elif isinstance(secret, dict):
                     # Secret with custom configuration
                     secret_name = secret.get('source', secret.get('name'))
@@ -552,15 +902,18 @@ def generate_compose(
                         secret_config['uid'] = secret['uid']
                     if 'gid' in secret:
                         secret_config['gid'] = secret['gid']
-                    
-                    config.setdefault('secrets', []).append(secret_config)
-                    compose['secrets'][secret_name] = {'external': True}
+
+                    secret_mounts.append(secret_config)
+                    compose_secrets[secret_name] = {'external': True}
+
+        if secret_mounts:
+            config['secrets'] = secret_mounts
 
         # Add health checks
         if health_enabled:
-            url = health_urls[i % len(health_urls)].strip() if i < len(health_urls) else '/health'
+            url = health_urls[i] if i < len(health_urls) else '/health'
             # Get health check port (use service port or from config)
-            health_port = port if port else svc_config.get('internal_port', '8080')
+            health_port = port if port else internal_port
             config['healthcheck'] = generate_healthcheck(
                 health_port, url, svc, advanced_health
             )
@@ -587,8 +940,8 @@ def generate_compose(
                         service_volume_list.append(f"{vol_name}:{vol_path}")
                     else:
                         service_volume_list.append(f"{vol_name}:{vol_path}")
-                        if vol_name not in compose['volumes']:
-                            compose['volumes'][vol_name] = {
+                        if vol_name not in compose_volumes:
+                            compose_volumes[vol_name] = {
                                 'driver': vol.get('driver', 'local'),
                                 'labels': {
                                     'service': svc,
@@ -604,14 +957,16 @@ def generate_compose(
         elif volume_persistence:
             volume = f'{svc}_{env}_volume'
             service_volume_list.append(f'{volume}:{volume_dir}')
-            compose['volumes'][volume] = {
-                'driver': 'local',
-                'labels': {
-                    'service': svc,
-                    'environment': env,
-                    'backup': 'true'
+            # Only build the definition dict the first time the volume is seen
+            if volume not in compose_volumes:
+                compose_volumes[volume] = {
+                    'driver': 'local',
+                    'labels': {
+                        'service': svc,
+                        'environment': env,
+                        'backup': 'true'
+                    }
                 }
-            }
         
         if service_volume_list:
             config['volumes'] = service_volume_list
@@ -621,7 +976,53 @@ def generate_compose(
     return compose
 
 
-def main():
+def split_csv(value) -> List[str]:
+    """Normalize a comma-separated string (or an already-split list) once.
+
+    An all-blank string yields [] so '' doesn't become a truthy [''], but
+    interior blanks are kept (stripped) - domains/ports/health_urls align
+    positionally with services, so filtering would shift later entries.
+    """
+    if isinstance(value, str):
+        items = [piece.strip() for piece in value.split(',')]
+        return items if any(items) else []
+    return value
+
+
+def json_loads(text: str) -> Any:
+    """Parse JSON text with orjson when available, stdlib json otherwise"""
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def load_json_args(raw_args: Dict[str, str]) -> Dict[str, Any]:
+    """Parse several JSON-valued CLI arguments with one json.loads call.
+
+    Each raw value is already JSON text, so batching them into a single
+    array document lets the C-level parser handle the lot in one pass
+    instead of once per argument. Empty/missing arguments are skipped.
+    A malformed argument either breaks the combined document or changes
+    the element count (a value with top-level commas or trailing garbage
+    spills extra elements into the array); both cases fall back to
+    per-argument parsing so the error points at the offending argument.
+    """
+    raw_args = {name: raw for name, raw in raw_args.items() if raw}
+    if not raw_args:
+        return {}
+    document = '[%s]' % ','.join(raw_args.values())
+    try:
+        values = json_loads(document)
+        if len(values) != len(raw_args):
+            raise ValueError('batched argument count mismatch')
+    except ValueError:
+        # Re-parse individually so the traceback points at the bad argument
+        return {name: json_loads(raw) for name, raw in raw_args.items()}
+    return dict(zip(raw_args, values))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the CLI argument parser (only constructed when actually parsing)"""
     parser = argparse.ArgumentParser(
         description='Generate production-ready Docker Compose configuration for Swarm deployments'
     )
@@ -641,6 +1042,9 @@ def main():
     parser.add_argument('--health-urls', default='/health', help='Health check URLs')
     parser.add_argument('--service-envs', default='{}', help='Service environment variables (JSON)')
     parser.add_argument('--output', default='docker-compose.yml', help='Output file')
+    parser.add_argument('--format', choices=['yaml', 'json'], dest='output_format',
+                        help='Output format (default: json if output ends in .json, else yaml). '
+                             'Docker accepts JSON compose files and json skips YAML emission entirely')
     
     # Enhanced features
     parser.add_argument('--enable-retry', action='store_true', 
@@ -682,13 +1086,25 @@ def main():
                        help='Per-service secrets configuration (JSON) - maps secrets to services')
     parser.add_argument('--config-file',
                        help='JSON configuration file (supports both object and array formats)')
-    
+    return parser
+
+
+def main():
+    parser = build_parser()
     args = parser.parse_args()
+
+    # Pull the argparse attributes consulted more than once below into
+    # locals in one sweep; every Namespace access is a getattr call
+    config_file = args.config_file
+    output_path = args.output
+    output_format = args.output_format
     
     # Load from config file if provided
-    if args.config_file:
-        with open(args.config_file, 'r') as f:
-            config = json.load(f)
+    if config_file:
+        # Read as bytes and parse through the orjson-aware loader; both
+        # orjson.loads and json.loads take utf-8 bytes directly
+        with open(config_file, 'rb') as f:
+            config = json_loads(f.read())
         
         # Check if it's array format or traditional format
         if isinstance(config, list):
@@ -697,20 +1113,13 @@ def main():
             config = parsed_config
         
         # Extract values from config, with command-line overrides
-        services = config.get('services', [])
-        if isinstance(services, str):
-            services = services.split(',')
-        
+        services = split_csv(config.get('services', []))
         images = config.get('images', {})
-        domains = config.get('domains', [])
-        if isinstance(domains, str):
-            domains = domains.split(',')
-        
+        domains = split_csv(config.get('domains', []))
+
         # Use command line values if provided, otherwise use config file
         replicas = args.replicas if args.replicas != 1 else config.get('replicas', 1)
-        ports = args.ports.split(',') if args.ports else config.get('ports', [])
-        if isinstance(ports, str):
-            ports = ports.split(',')
+        ports = split_csv(args.ports if args.ports else config.get('ports', []))
         
         env = args.env if args.env != 'prod' else config.get('env', 'prod')
         fqdn = args.fqdn if args.fqdn else config.get('fqdn', 'example.com')
@@ -728,9 +1137,7 @@ def main():
         
         # Other config values
         volume_dir = args.volume_dir if args.volume_dir != '/data' else config.get('volume_dir', '/data')
-        health_urls = config.get('health_urls', ['/health'])
-        if isinstance(health_urls, str):
-            health_urls = health_urls.split(',')
+        health_urls = split_csv(config.get('health_urls', ['/health']))
         
         deployment_strategy = args.deployment_strategy if args.deployment_strategy != 'rolling' else config.get('deployment_strategy', 'rolling')
         
@@ -749,10 +1156,25 @@ def main():
         
     else:
         # Parse from command line arguments
-        services = args.services.split(',')
-        images = json.loads(args.images)
-        domains = args.domains.split(',')
-        ports = args.ports.split(',')
+        # Parse every JSON-valued argument in one batched call
+        parsed_json = load_json_args({
+            'images': args.images,
+            'service_envs': args.service_envs,
+            'node_constraints': args.node_constraints,
+            'service_resources': args.service_resources,
+            'advanced_health': args.advanced_health,
+            'retry_config': args.retry_config,
+            'rate_limit_config': args.rate_limit_config,
+            'metrics_paths': args.metrics_paths,
+            'service_configs': args.service_configs,
+            'service_volumes': args.service_volumes,
+            'service_secrets': args.service_secrets
+        })
+
+        services = split_csv(args.services) if args.services else []
+        images = parsed_json.get('images', {})
+        domains = split_csv(args.domains) if args.domains else []
+        ports = split_csv(args.ports) if args.ports else []
         replicas = args.replicas
         env = args.env
         fqdn = args.fqdn
@@ -760,7 +1182,7 @@ def main():
         resource_limits = args.resource_limits
         volume_persistence = args.volume_persistence
         volume_dir = args.volume_dir
-        health_urls = args.health_urls.split(',')
+        health_urls = split_csv(args.health_urls)
         enable_retry = args.enable_retry
         enable_rate_limit = args.enable_rate_limit
         enable_monitoring = args.enable_monitoring
@@ -770,44 +1192,44 @@ def main():
         use_secrets = args.use_secrets
         external_networks = args.external_networks
         
-        service_envs = json.loads(args.service_envs)
-        node_constraints = json.loads(args.node_constraints) if args.node_constraints else None
-        service_resources = json.loads(args.service_resources) if args.service_resources else None
-        advanced_health = json.loads(args.advanced_health) if args.advanced_health else None
-        retry_config = json.loads(args.retry_config) if args.retry_config else None
-        rate_limit_config = json.loads(args.rate_limit_config) if args.rate_limit_config else None
-        metrics_paths = json.loads(args.metrics_paths) if args.metrics_paths else None
-        service_configs = json.loads(args.service_configs) if args.service_configs else None
-        service_volumes = json.loads(args.service_volumes) if args.service_volumes else None
-        service_secrets = json.loads(args.service_secrets) if args.service_secrets else None
-    
-    # Validate inputs
-    if not args.config_file and (not args.services or not args.images or not args.domains or not args.fqdn or not args.ports):
-        print("❌ When not using --config-file, the following arguments are required: --services, --images, --domains, --fqdn, --ports")
-        sys.exit(1)
+        service_envs = parsed_json.get('service_envs', {})
+        node_constraints = parsed_json.get('node_constraints')
+        service_resources = parsed_json.get('service_resources')
+        advanced_health = parsed_json.get('advanced_health')
+        retry_config = parsed_json.get('retry_config')
+        rate_limit_config = parsed_json.get('rate_limit_config')
+        metrics_paths = parsed_json.get('metrics_paths')
+        service_configs = parsed_json.get('service_configs')
+        service_volumes = parsed_json.get('service_volumes')
+        service_secrets = parsed_json.get('service_secrets')
     
+    # Validate inputs through argparse so failures get the standard
+    # usage + error output and exit status
+    if not config_file and (not args.services or not args.images or not args.domains or not args.fqdn or not args.ports):
+        parser.error("when not using --config-file, the following arguments are required: "
+                     "--services, --images, --domains, --fqdn, --ports")
+
     if not services:
-        print("❌ Services are required")
-        sys.exit(1)
+        parser.error("services are required")
     
     # Only require domains and ports if we have exposed services
-    if args.config_file:
+    if config_file:
         # Check if any service is exposed
-        has_exposed = any(
-            service_configs.get(svc, {}).get('expose', True) 
-            for svc in services 
-            if not ('worker' in svc.lower() or 'job' in svc.lower())
-        )
+        if service_configs:
+            has_exposed = any(classify_exposure(services, service_configs).values())
+        else:
+            # Without per-service configs only the worker/job name check
+            # matters, so any() short-circuits on the first non-worker
+            has_exposed = any(not is_background_service(svc) for svc in services)
         if has_exposed and (not domains or not ports):
-            print("❌ Domains and ports are required for exposed services")
-            sys.exit(1)
+            parser.error("domains and ports are required for exposed services")
     elif not domains or not ports:
-        print("❌ Services, domains, and ports are required")
-        sys.exit(1)
-    
-    if volume_dir and not volume_dir.startswith('/'):
-        print("❌ volume_dir must be an absolute path")
-        sys.exit(1)
+        parser.error("services, domains, and ports are required")
+
+    # Slice compare instead of startswith: no method lookup, no argument
+    # allocation, and it is safe on empty strings
+    if volume_dir and volume_dir[:1] != '/':
+        parser.error("volume_dir must be an absolute path")
     
     # Generate compose
     compose = generate_compose(
@@ -843,19 +1265,30 @@ def main():
         service_secrets=service_secrets
     )
     
-    # Write output
-    with open(args.output, 'w') as f:
-        yaml.dump(compose, f, default_flow_style=False, sort_keys=False)
-    
-    print(f"✅ Generated {args.output}")
+    # Write output - JSON is valid input for docker stack/compose and is much
+    # cheaper to serialize, so use it whenever the caller asked for it
+    if output_format is None:
+        output_format = 'json' if output_path.endswith('.json') else 'yaml'
+
+    with open(output_path, 'w', buffering=_OUTPUT_BUFFER_SIZE) as f:
+        if output_format == 'json':
+            json.dump(compose, f, indent=2)
+        else:
+            # The compose tree contains only canonical builtin primitives,
+            # so the specialized writer serializes it directly with no
+            # representer/node layer in between
+            dump_compose_yaml(compose, f)
     
-    # Print warnings if applicable
-    if args.use_secrets:
-        print("⚠️  Remember to create the external secrets before deploying")
+    # Collect the status line plus any applicable warnings from the
+    # module-level templates and flush them to stdout with a single write
+    messages = [_MSG_GENERATED.format(output=output_path)]
+    if use_secrets:
+        messages.append(_WARN_SECRETS)
     if node_constraints:
-        print("⚠️  Ensure nodes have the required labels for placement constraints")
-    if args.enable_network_separation:
-        print("ℹ️  Network separation enabled - ensure services can communicate as needed")
+        messages.append(_WARN_CONSTRAINTS)
+    if enable_network_separation:
+        messages.append(_INFO_NETWORK_SEPARATION)
+    sys.stdout.write('\n'.join(messages) + '\n')
 
 
 if __name__ == '__main__':
@@ -0,0 +1,73 @@
+#!/bin/bash
+# Test script for the built-in YAML writer in generate-compose.py
+#
+# Round-trips adversarial scalars (newlines, tabs, control characters,
+# YAML-lookalike strings) and container edge cases through yaml.safe_load
+# to verify the writer emits exactly what a loader reads back.
+# Requires PyYAML (pip install pyyaml) as the reference loader.
+
+set -e
+
+echo "Testing compose YAML writer in generate-compose.py"
+echo "==================================================="
+
+# Change to script directory
+cd "$(dirname "$0")"
+
+python3 - << 'EOF'
+import importlib.util
+import io
+import sys
+
+import yaml
+
+spec = importlib.util.spec_from_file_location('generate_compose', 'generate-compose.py')
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+
+scalars = [
+    # Multi-line and control-character strings (PEM-style values, tabs,
+    # carriage returns, escapes, NUL, DEL, zero-width space)
+    '-----BEGIN CERT-----\nMIIB\n-----END CERT-----',
+    'line1\nline2\n',
+    'col1\tcol2',
+    'crlf\r\nending',
+    'bell\a backspace\b escape\x1b',
+    'nul\x00byte',
+    'del\x7fchar',
+    'zero​width',
+    # Strings a YAML 1.1 loader would otherwise retype or misparse
+    'yes', 'OFF', 'null', '~', '=', '0x1F', '0o17', '010', '1:30', '1:30:00',
+    '1e5', '.inf', '.NaN', '2024-01-01', '2024-01-01T00:00:00Z',
+    '- leading dash', '? key', ': value', '#comment', '@handle', '`tick',
+    'key: value', 'trailing:', 'space #hash', "it's quoted", '"doubled"',
+    '', ' padded ', '*anchor', '&ref', '!tag', '|block', '>folded', '%tag',
+    # Non-string scalars
+    True, False, None, 0, -42, 3.14, 1e-09, float('inf'),
+]
+
+documents = [
+    {'scalars': scalars},
+    {'mapping': {str(i): value for i, value in enumerate(scalars)}},
+    {'nested': [{'env': ['A=x\ny', 'B=ok'], 'labels': ['a=1', 'b=2']}]},
+    # Container edge cases: empty dict/list values and sequence items
+    {'empty': {}, 'none': [], 'items': [{}, [], {'a': {}}, {'b': []}, [1, 2]]},
+]
+
+failures = 0
+for document in documents:
+    stream = io.StringIO()
+    module.dump_compose_yaml(document, stream)
+    loaded = yaml.safe_load(stream.getvalue())
+    if loaded != document:
+        failures += 1
+        print('❌ Round-trip mismatch:')
+        print('  wrote :', document)
+        print('  loaded:', loaded)
+
+if failures:
+    sys.exit(1)
+print('✅ All %d documents round-trip unchanged' % len(documents))
+EOF
+
+echo -e "\n✅ All tests completed successfully!"